@@ -0,0 +1,120 @@
+"""Микробенчмарк построения ответов: сборка на каждое сообщение против реестра replies, по частям.
+
+Запуск из корня проекта:
+    python benchmarks/bench_replies.py
+"""
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+
+import replies
+
+ITERATIONS = 20_000
+CITIES = [f"Город {i}" for i in range(50)]
+
+PROFILE = {
+    'name': 'Аня',
+    'age': 21,
+    'city': 'Севастополь',
+    'description': 'привет как дела',
+}
+
+
+# Прежний способ: новое дерево моделей на каждый ответ
+def old_start_keyboard():
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text="Создать анкету")],
+            [KeyboardButton(text="Моя анкета")]
+        ],
+        resize_keyboard=True,
+        one_time_keyboard=True
+    )
+
+
+def old_city_keyboard(city):
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text=city)],
+            [KeyboardButton(text="Пропустить")]
+        ],
+        resize_keyboard=True,
+        one_time_keyboard=True
+    )
+
+
+def old_age_keyboard(age):
+    if age is not None:
+        return ReplyKeyboardMarkup(
+            keyboard=[[KeyboardButton(text=str(age))]],
+            resize_keyboard=True,
+            one_time_keyboard=True
+        )
+    return ReplyKeyboardRemove()
+
+
+def old_caption(profile):
+    return (
+        f"👤 <b>{profile['name']}</b>, {profile['age']}, {profile['city']}\n"
+        f"📝 <i>{profile['description'] or 'Нет описания'}</i>"
+    )
+
+
+def city_for(i):
+    return CITIES[i % len(CITIES)]
+
+
+def age_for(i):
+    return 12 + i % 88
+
+
+# Каждая часть ответа меряется отдельно: (название, прежний способ, реестр)
+PARTS = [
+    ("стартовая клавиатура", lambda i: old_start_keyboard(), lambda i: replies.START_KEYBOARD),
+    ("клавиатура города", lambda i: old_city_keyboard(city_for(i)), lambda i: replies.get_city_keyboard(city_for(i))),
+    ("клавиатура возраста", lambda i: old_age_keyboard(age_for(i)), lambda i: replies.get_age_keyboard(age_for(i))),
+    ("подпись анкеты", lambda i: old_caption(PROFILE), lambda i: replies.profile_caption(PROFILE)),
+]
+
+
+def measure(func):
+    """Возвращает (мкс на вызов, байт временных объектов на вызов)"""
+    # Прогрев: заполняет LRU и ленивую сборку схем pydantic
+    for i in range(200):
+        func(i)
+
+    counter = iter(range(10 ** 9))
+    seconds = timeit.timeit(lambda: func(next(counter)), number=ITERATIONS)
+
+    # Пиковая память внутри одного вызова — объём временных объектов
+    allocated = 0
+    tracemalloc.start()
+    for i in range(ITERATIONS):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(i)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    return seconds / ITERATIONS * 1e6, allocated / ITERATIONS
+
+
+def main():
+    print(f"{ITERATIONS} вызовов на каждую часть ответа\n")
+    print(f"{'часть':<22} {'сборка, мкс':>12} {'реестр, мкс':>12} {'ускорение':>10} "
+          f"{'сборка, байт':>13} {'реестр, байт':>13}")
+    for name, old, new in PARTS:
+        old_us, old_bytes = measure(old)
+        new_us, new_bytes = measure(new)
+        print(f"{name:<22} {old_us:12.2f} {new_us:12.2f} {old_us / new_us:9.1f}x "
+              f"{old_bytes:13.0f} {new_bytes:13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Корневой conftest: pytest добавляет корень проекта в sys.path для тестов из tests/
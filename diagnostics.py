@@ -0,0 +1,328 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aiogram import Bot, Router, types, F, BaseMiddleware
+from aiogram.filters import Command, CommandObject
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Отдельный логгер для трассировки медленных апдейтов (пишется только в файл).
+# Записи уходят в очередь, а в файл их пишет поток QueueListener: ни event loop,
+# ни сторож не трогают диск и не ждут блокировку файлового обработчика
+trace_logger = logging.getLogger("diagnostics.trace")
+trace_logger.propagate = False
+
+# Трасса текущего апдейта (живёт в контексте задачи, обрабатывающей апдейт)
+_current_trace: ContextVar[Optional["UpdateTrace"]] = ContextVar("current_trace", default=None)
+
+
+def _env_float(name: str, default: float) -> float:
+    """Читает число из переменной окружения"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Некорректное значение {name}, используется {default}")
+        return default
+
+
+class UpdateTrace:
+    """Замеры времени для одного апдейта"""
+
+    __slots__ = ("update_id", "user_id", "handler", "state", "started", "storage", "network", "requests")
+
+    def __init__(self, update_id: int, user_id: Optional[int] = None):
+        self.update_id = update_id
+        self.user_id = user_id
+        self.handler: Optional[str] = None
+        self.state: Optional[str] = None
+        self.started = time.perf_counter()
+        self.storage = 0.0
+        self.network = 0.0
+        self.requests: list = []
+
+    def as_dict(self, total: float) -> Dict[str, Any]:
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'update_id': self.update_id,
+            'user_id': self.user_id,
+            'handler': self.handler,
+            'state': self.state,
+            'total_ms': round(total * 1000, 1),
+            'storage_ms': round(self.storage * 1000, 1),
+            'network_ms': round(self.network * 1000, 1),
+            'other_ms': round((total - self.storage - self.network) * 1000, 1),
+            'requests': self.requests,
+        }
+
+
+class LoopWatchdog:
+    """Сторожевой поток: замечает блокировки event loop и снимает стек"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.01)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._heartbeat: Optional[asyncio.TimerHandle] = None
+        self._stop: Optional[threading.Event] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Запускает пульс в event loop и поток-наблюдатель"""
+        if self._stop is not None and not self._stop.is_set():
+            return
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        # У каждого запуска своё событие остановки: поток прошлого запуска
+        # может ещё не завершиться, но он уже увидел своё событие
+        self._stop = threading.Event()
+        self._beat()
+        threading.Thread(target=self._watch, args=(self._stop,), name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        """Останавливает наблюдение (поток завершится сам, не блокируя event loop)"""
+        if self._stop is not None:
+            self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    def _beat(self) -> None:
+        """Пульс: выполняется внутри event loop, пока он не заблокирован"""
+        self._last_beat = time.monotonic()
+        if self._stop is not None and not self._stop.is_set():
+            self._heartbeat = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self, stop: threading.Event) -> None:
+        stalled_since: Optional[float] = None
+        while not stop.wait(self.interval):
+            lag = time.monotonic() - self._last_beat
+            if lag < self.threshold:
+                if stalled_since is not None:
+                    logger.warning(f"Event loop разблокирован спустя {self._last_beat - stalled_since:.3f} с")
+                    stalled_since = None
+                continue
+            # Снимаем стек один раз на каждую блокировку
+            if stalled_since == self._last_beat:
+                continue
+            stalled_since = self._last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<стек недоступен>"
+            logger.warning(f"Event loop заблокирован дольше {lag:.3f} с. Стек:\n{stack}")
+            trace_logger.info(json.dumps({
+                'timestamp': datetime.now().isoformat(),
+                'event': 'loop_stall',
+                'lag_ms': round(lag * 1000, 1),
+                'stack': stack,
+            }, ensure_ascii=False))
+
+
+class Diagnostics:
+    """Подсистема диагностики: сторож event loop и трассировка медленных апдейтов"""
+
+    def __init__(self):
+        self.enabled = False
+        self.stall_threshold = 0.1
+        self.slow_update_threshold = 0.5
+        self.trace_file = "diagnostics_trace.log"
+        # Множество изменяется на месте: на него ссылается фильтр команды /diag
+        self.admin_ids: Set[int] = set()
+        self.watchdog = LoopWatchdog(self.stall_threshold)
+        self._queue_handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def load_config(self) -> None:
+        """Читает настройки из окружения (после load_dotenv)"""
+        self.stall_threshold = _env_float("DIAG_STALL_THRESHOLD", self.stall_threshold)
+        self.slow_update_threshold = _env_float("DIAG_SLOW_UPDATE_THRESHOLD", self.slow_update_threshold)
+        self.trace_file = os.getenv("DIAG_TRACE_FILE", self.trace_file)
+        self.admin_ids.clear()
+        self.admin_ids.update(
+            int(admin_id) for admin_id in os.getenv("ADMIN_IDS", "").split(",") if admin_id.strip().isdigit()
+        )
+        if not self.enabled:
+            self.watchdog = LoopWatchdog(self.stall_threshold)
+
+    def setup(self, dp, bot: Bot) -> None:
+        """Читает настройки и регистрирует middleware трассировки в диспетчере и сессии бота"""
+        self.load_config()
+        dp.update.outer_middleware(UpdateTraceMiddleware(self))
+        dp.message.middleware(HandlerTraceMiddleware())
+        bot.session.middleware(NetworkTraceMiddleware())
+
+    def enable(self) -> None:
+        """Включает диагностику (вызывать изнутри event loop)"""
+        if self.enabled:
+            return
+        trace_queue: queue.SimpleQueue = queue.SimpleQueue()
+        file_handler = RotatingFileHandler(
+            self.trace_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8'
+        )
+        self._listener = QueueListener(trace_queue, file_handler)
+        self._listener.start()
+        self._queue_handler = QueueHandler(trace_queue)
+        trace_logger.addHandler(self._queue_handler)
+        trace_logger.setLevel(logging.INFO)
+        self.watchdog.start(asyncio.get_running_loop())
+        self.enabled = True
+        logger.info(f"Диагностика включена, трасса пишется в {self.trace_file}")
+
+    def disable(self) -> None:
+        """Выключает диагностику"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.watchdog.stop()
+        trace_logger.removeHandler(self._queue_handler)
+        self._queue_handler = None
+        # Дописывает оставшиеся в очереди записи и закрывает файл
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        logger.info("Диагностика выключена")
+
+    def record(self, trace: UpdateTrace) -> None:
+        """Пишет апдейт в трассу, если он обрабатывался дольше порога"""
+        total = time.perf_counter() - trace.started
+        if total < self.slow_update_threshold:
+            return
+        entry = trace.as_dict(total)
+        entry['event'] = 'slow_update'
+        trace_logger.info(json.dumps(entry, ensure_ascii=False))
+        logger.warning(
+            f"Медленный апдейт {trace.update_id}: {entry['total_ms']} мс "
+            f"(хранилище {entry['storage_ms']} мс, сеть {entry['network_ms']} мс), обработчик {trace.handler}"
+        )
+
+
+class UpdateTraceMiddleware(BaseMiddleware):
+    """Внешний middleware: открывает трассу на время обработки апдейта"""
+
+    def __init__(self, diag: Diagnostics):
+        self.diag = diag
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: types.Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not self.diag.enabled:
+            return await handler(event, data)
+
+        user = data.get("event_from_user")
+        trace = UpdateTrace(event.update_id, user.id if user else None)
+        trace.state = data.get("raw_state")
+        token = _current_trace.set(trace)
+        try:
+            return await handler(event, data)
+        finally:
+            _current_trace.reset(token)
+            self.diag.record(trace)
+
+
+class HandlerTraceMiddleware(BaseMiddleware):
+    """Внутренний middleware: запоминает сработавший обработчик и состояние FSM"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        trace = _current_trace.get()
+        if trace is not None:
+            handler_object = data.get("handler")
+            callback = getattr(handler_object, "callback", None)
+            if callback is not None:
+                trace.handler = f"{callback.__module__}.{callback.__qualname__}"
+            trace.state = data.get("raw_state")
+        return await handler(event, data)
+
+
+class NetworkTraceMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: учитывает время запросов к Bot API"""
+
+    async def __call__(self, make_request, bot: Bot, method):
+        trace = _current_trace.get()
+        if trace is None:
+            return await make_request(bot, method)
+
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            elapsed = time.perf_counter() - started
+            trace.network += elapsed
+            trace.requests.append({'method': type(method).__name__, 'ms': round(elapsed * 1000, 1)})
+
+
+def traced_storage(func: Callable) -> Callable:
+    """Декоратор для функций работы с файлом профилей: учитывает время хранилища"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return await func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                trace.storage += time.perf_counter() - started
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = _current_trace.get()
+        if trace is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            trace.storage += time.perf_counter() - started
+    return wrapper
+
+
+# Единственный экземпляр подсистемы диагностики
+diagnostics = Diagnostics()
+
+
+# Переключение диагностики во время работы: /diag on | off | status
+@router.message(Command("diag"), F.from_user.id.in_(diagnostics.admin_ids))
+async def toggle_diagnostics(message: types.Message, command: CommandObject):
+    action = (command.args or "status").strip().lower()
+
+    if action == "on":
+        diagnostics.enable()
+    elif action == "off":
+        diagnostics.disable()
+    elif action != "status":
+        await message.answer("Использование: /diag on | off | status")
+        return
+
+    status = "включена" if diagnostics.enabled else "выключена"
+    await message.answer(
+        f"🩺 Диагностика {status}.\n"
+        f"Порог блокировки loop: {diagnostics.stall_threshold * 1000:.0f} мс\n"
+        f"Порог медленного апдейта: {diagnostics.slow_update_threshold * 1000:.0f} мс\n"
+        f"Файл трассы: {diagnostics.trace_file}"
+    )
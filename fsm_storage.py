@@ -0,0 +1,215 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from copy import copy
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiogram import Bot
+from aiogram.fsm.storage.base import StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from states import Form
+
+logger = logging.getLogger(__name__)
+
+# Время жизни сессии на каждом шаге анкеты (секунды), отсчитывается от последней активности
+FORM_STEP_TTL: Dict[str, float] = {
+    Form.name.state: 30 * 60,
+    Form.age.state: 30 * 60,
+    Form.city.state: 30 * 60,
+    Form.description.state: 60 * 60,
+    Form.photo.state: 60 * 60,
+}
+
+NUDGE_TEXT = (
+    "⏳ Анкета ещё не заполнена до конца. Просто ответь на последний вопрос — "
+    "продолжим с того места, где остановились."
+)
+
+# Допустимый запас устаревших элементов кучи сверх живых до её пересборки
+HEAP_COMPACT_SLACK = 64
+
+# Элемент кучи: (срок, токен продления, это напоминание, ключ)
+_HeapEntry = Tuple[float, int, bool, StorageKey]
+
+
+def env_float(name: str, default: float) -> float:
+    """Читает число из переменной окружения; при ошибке предупреждает и берёт значение по умолчанию"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Некорректное значение {name}: {value}, используется {default}")
+        return default
+
+
+def load_step_ttl() -> Dict[str, float]:
+    """TTL шагов с переопределением через окружение: FSM_TTL_NAME, FSM_TTL_PHOTO и т.д."""
+    ttl = dict(FORM_STEP_TTL)
+    for state in Form.get_all_states():
+        step = state.state.split(":")[-1].upper()
+        ttl[state.state] = env_float(f"FSM_TTL_{step}", ttl[state.state])
+    return ttl
+
+
+class ExpiringMemoryStorage(MemoryStorage):
+    """MemoryStorage с истечением сессий по TTL шага и сборкой брошенных анкет.
+
+    Сроки хранятся в min-куче, поэтому чистильщик просыпается только к ближайшему
+    сроку. Каждое продление срока добавляет новые элементы, а устаревшие отбрасываются
+    по токену последнего продления. Когда их накапливается больше, чем живых,
+    куча пересобирается. Поэтому её размер остаётся O(число сессий), а продление и
+    истечение стоят O(log n) амортизированно.
+    """
+
+    def __init__(
+        self,
+        step_ttl: Optional[Dict[str, float]] = None,
+        default_ttl: float = 60 * 60,
+        nudge_before: Optional[float] = None,
+        nudge_text: str = NUDGE_TEXT,
+    ) -> None:
+        super().__init__()
+        self.step_ttl = step_ttl if step_ttl is not None else load_step_ttl()
+        self.default_ttl = default_ttl
+        self.nudge_before = nudge_before
+        self.nudge_text = nudge_text
+        self._heap: List[_HeapEntry] = []
+        self._tokens: Dict[StorageKey, int] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._sweeper: Optional[asyncio.Task] = None
+        # Напоминания отправляются отдельными задачами, чтобы медленный запрос
+        # не задерживал истечение остальных сессий; ссылки держим до завершения
+        self._nudges: Set[asyncio.Task] = set()
+        self._bot: Optional[Bot] = None
+
+    async def start(self, bot: Bot) -> None:
+        """Запускает фоновый чистильщик (регистрируется в dp.startup)"""
+        self._bot = bot
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+            logger.info("Запущена очистка брошенных FSM-сессий")
+
+    async def close(self) -> None:
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        for task in self._nudges:
+            task.cancel()
+        self._nudges.clear()
+
+    # Чтение не создаёт записей: иначе каждый написавший боту остаётся в памяти навсегда
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self.storage.get(key)
+        if record is None:
+            return None
+        # FSM middleware читает состояние на каждом апдейте: это и есть активность
+        # пользователя, даже если обработчик отклонит ввод и ничего не запишет
+        if record.state is not None:
+            self._touch(key)
+        return record.state
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self.storage.get(key)
+        return record.data.copy() if record else {}
+
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Any = None) -> Any:
+        record = self.storage.get(storage_key)
+        if record is None:
+            return default
+        return copy(record.data.get(dict_key, default))
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await super().set_state(key, state)
+        self._touch(key)
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        await super().set_data(key, data)
+        self._touch(key)
+
+    def _touch(self, key: StorageKey) -> None:
+        """Продлевает срок жизни сессии после записи или нового апдейта"""
+        record = self.storage[key]
+        if record.state is None and not record.data:
+            self._drop(key)
+            return
+
+        ttl = self.step_ttl.get(record.state, self.default_ttl)
+        token = next(self._counter)
+        self._tokens[key] = token
+
+        now = time.monotonic()
+        self._push(now + ttl, token, False, key)
+        if self.nudge_before and record.state and ttl > self.nudge_before:
+            self._push(now + ttl - self.nudge_before, token, True, key)
+
+    def _push(self, deadline: float, token: int, nudge: bool, key: StorageKey) -> None:
+        # Будим чистильщик, только если новый срок раньше текущего ближайшего
+        if not self._heap or deadline < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (deadline, token, nudge, key))
+        # На сессию приходится не больше двух живых элементов (срок и напоминание)
+        if len(self._heap) > 4 * len(self._tokens) + HEAP_COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Выбрасывает из кучи устаревшие элементы"""
+        self._heap = [entry for entry in self._heap if self._tokens.get(entry[3]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def _drop(self, key: StorageKey) -> None:
+        self.storage.pop(key, None)
+        self._tokens.pop(key, None)
+
+    async def _sweep(self) -> None:
+        while True:
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            _, token, nudge, key = heapq.heappop(self._heap)
+            if self._tokens.get(key) != token:
+                continue
+
+            if nudge:
+                task = asyncio.create_task(self._send_nudge(key))
+                self._nudges.add(task)
+                task.add_done_callback(self._nudges.discard)
+            else:
+                state = self.storage[key].state
+                self._drop(key)
+                logger.info(f"Сессия пользователя {key.user_id} истекла на шаге {state}")
+
+    async def _send_nudge(self, key: StorageKey) -> None:
+        """Напоминание «продолжи с того места, где остановился»"""
+        if not self._bot:
+            return
+        try:
+            await self._bot.send_message(key.chat_id, self.nudge_text)
+        except Exception as e:
+            logger.warning(f"Не удалось отправить напоминание пользователю {key.user_id}: {e}")
+
+    @property
+    def active_sessions(self) -> int:
+        """Количество хранимых сессий"""
+        return len(self.storage)
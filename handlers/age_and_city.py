@@ -1,10 +1,16 @@
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 from states import Form
+from diagnostics import traced_storage
+from replies import (
+    REMOVE_KEYBOARD, SKIP_TEXT_LOWER, ASK_AGE_TEXT, ASK_CITY_TEXT, ASK_DESCRIPTION_TEXT,
+    AGE_NOT_NUMBER_TEXT, AGE_TOO_LOW_TEXT, AGE_TOO_HIGH_TEXT, CITY_TOO_SHORT_TEXT,
+    CITY_TOO_LONG_TEXT, SAVE_ERROR_TEXT, SAVE_ERROR_RETRY_LATER_TEXT,
+    get_age_keyboard, get_city_keyboard
+)
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Dict, Any
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -12,6 +18,7 @@ logger = logging.getLogger(__name__)
 # Функция для загрузки данных из файла с кешированием
 PROFILES_CACHE: Dict[str, Any] = {}
 
+@traced_storage
 async def load_profile(user_id: int) -> Dict[str, Any]:
     """Загружает профиль пользователя с кешированием"""
     try:
@@ -29,6 +36,7 @@ async def load_profile(user_id: int) -> Dict[str, Any]:
         logger.error(f"Неожиданная ошибка: {e}")
         return {}
 
+@traced_storage
 def save_profile(user_id: int, data: Dict[str, Any]) -> bool:
     """Сохраняет профиль пользователя"""
     try:
@@ -53,40 +61,13 @@ def save_profile(user_id: int, data: Dict[str, Any]) -> bool:
         logger.error(f"Ошибка сохранения профиля: {e}")
         return False
 
-def get_city_keyboard(city: Optional[str] = None) -> ReplyKeyboardMarkup:
-    """Возвращает клавиатуру для выбора города"""
-    if city:
-        return ReplyKeyboardMarkup(
-            keyboard=[
-                [KeyboardButton(text=city)],
-                [KeyboardButton(text="Пропустить")]
-            ],
-            resize_keyboard=True,
-            one_time_keyboard=True
-        )
-    return ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text="Пропустить")]],
-        resize_keyboard=True,
-        one_time_keyboard=True
-    )
-
-def get_age_keyboard(age: Optional[int] = None) -> ReplyKeyboardMarkup:
-    """Возвращает клавиатуру для выбора возраста"""
-    if age is not None:
-        return ReplyKeyboardMarkup(
-            keyboard=[[KeyboardButton(text=str(age))]],
-            resize_keyboard=True,
-            one_time_keyboard=True
-        )
-    return ReplyKeyboardRemove()
-
 async def ask_age(message: types.Message, state: FSMContext):
     """Запрашивает возраст пользователя"""
     user_data = await load_profile(message.from_user.id)
     age = user_data.get("age")
     
     await message.answer(
-        "📅 Введите ваш возраст (от 12 до 99 лет):",
+        ASK_AGE_TEXT,
         reply_markup=get_age_keyboard(age)
     )
     await state.set_state(Form.age)
@@ -104,22 +85,22 @@ async def process_age(message: types.Message, state: FSMContext):
 
     # Валидация возраста
     if not message.text.isdigit():
-        await message.answer("❌ Возраст должен быть числом. Попробуйте еще раз!")
+        await message.answer(AGE_NOT_NUMBER_TEXT)
         return
         
     age = int(message.text)
     
     if age < 12:
-        await message.answer("❌ Минимальный возраст - 12 лет.")
+        await message.answer(AGE_TOO_LOW_TEXT)
         return
     elif age > 99:
-        await message.answer("❌ Максимальный возраст - 99 лет.")
+        await message.answer(AGE_TOO_HIGH_TEXT)
         return
 
     # Сохраняем возраст
     user_data["age"] = age
     if not save_profile(user_id, user_data):
-        await message.answer("⚠️ Произошла ошибка при сохранении. Попробуйте позже.")
+        await message.answer(SAVE_ERROR_RETRY_LATER_TEXT)
         return
 
     await ask_city(message, state)
@@ -130,7 +111,7 @@ async def ask_city(message: types.Message, state: FSMContext):
     city = user_data.get("city")
     
     await message.answer(
-        "🏙 В каком городе вы живете?",
+        ASK_CITY_TEXT,
         reply_markup=get_city_keyboard(city)
     )
     await state.set_state(Form.city)
@@ -143,23 +124,23 @@ async def process_city(message: types.Message, state: FSMContext):
     city = message.text.strip()
 
     # Обработка пропуска
-    if city.lower() == "пропустить":
+    if city.lower() == SKIP_TEXT_LOWER:
         user_data["city"] = "Не указан"
         if not save_profile(user_id, user_data):
-            await message.answer("⚠️ Произошла ошибка при сохранении.")
+            await message.answer(SAVE_ERROR_TEXT)
             return
     else:
         # Валидация города
         if len(city) < 2:
-            await message.answer("❌ Название города слишком короткое.")
+            await message.answer(CITY_TOO_SHORT_TEXT)
             return
         if len(city) > 50:
-            await message.answer("❌ Название города слишком длинное.")
+            await message.answer(CITY_TOO_LONG_TEXT)
             return
             
         user_data["city"] = city
         if not save_profile(user_id, user_data):
-            await message.answer("⚠️ Произошла ошибка при сохранении.")
+            await message.answer(SAVE_ERROR_TEXT)
             return
 
     await ask_description(message, state)
@@ -167,7 +148,7 @@ async def process_city(message: types.Message, state: FSMContext):
 async def ask_description(message: types.Message, state: FSMContext):
     """Переход к запросу описания"""
     await message.answer(
-        "✏️ Теперь расскажите немного о себе (минимум 10 символов):",
-        reply_markup=ReplyKeyboardRemove()
+        ASK_DESCRIPTION_TEXT,
+        reply_markup=REMOVE_KEYBOARD
     )
     await state.set_state(Form.description)
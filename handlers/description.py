@@ -3,8 +3,12 @@ import logging
 from typing import Dict, Any
 from aiogram import Router, types
 from aiogram.fsm.context import FSMContext
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 from states import Form
+from diagnostics import traced_storage
+from replies import (
+    REMOVE_KEYBOARD, SKIP_TEXT_LOWER, DESCRIPTION_SKIPPED_TEXT, DESCRIPTION_SAVED_TEXT,
+    DESCRIPTION_INVALID_TEXT, DESCRIPTION_FORBIDDEN_TEXT, GENERIC_ERROR_LATER_TEXT
+)
 from handlers import photo
 
 router = Router()
@@ -13,13 +17,7 @@ logger = logging.getLogger(__name__)
 # Кеш профилей (опционально)
 PROFILES_CACHE: Dict[str, Any] = {}
 
-def get_skip_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text="Пропустить")]],
-        resize_keyboard=True,
-        one_time_keyboard=True
-    )
-
+@traced_storage
 async def load_profile(user_id: int) -> dict:
     """Загружает профиль из кеша или файла."""
     if str(user_id) in PROFILES_CACHE:
@@ -33,6 +31,7 @@ async def load_profile(user_id: int) -> dict:
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
+@traced_storage
 def save_profile(user_id: int, data: dict) -> None:
     """Сохраняет профиль в файл и кеш."""
     try:
@@ -58,26 +57,26 @@ async def process_description(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
     logger.info(f"User {user_id} submitted description: {description}")
 
-    if description.lower() == "пропустить":
-        await message.answer("✅ Описание пропущено.", reply_markup=ReplyKeyboardRemove())
+    if description.lower() == SKIP_TEXT_LOWER:
+        await message.answer(DESCRIPTION_SKIPPED_TEXT, reply_markup=REMOVE_KEYBOARD)
         await photo.ask_photo(message, state)
         return
 
     if len(description) < 10 or len(description.split()) < 2:
-        await message.answer("❌ Описание должно быть не короче 10 символов и 2 слов.")
+        await message.answer(DESCRIPTION_INVALID_TEXT)
         return
 
     forbidden_words = ["реклама", "спам", "мат"]
     if any(word in description.lower() for word in forbidden_words):
-        await message.answer("❌ Обнаружены запрещённые слова.")
+        await message.answer(DESCRIPTION_FORBIDDEN_TEXT)
         return
 
     try:
         user_data = await load_profile(user_id)
         user_data["description"] = description
         save_profile(user_id, user_data)
-        await message.answer("✅ Описание сохранено!", reply_markup=ReplyKeyboardRemove())
+        await message.answer(DESCRIPTION_SAVED_TEXT, reply_markup=REMOVE_KEYBOARD)
         await photo.ask_photo(message, state)
     except Exception as e:
         logger.error(f"Ошибка сохранения: {e}")
-        await message.answer("❌ Ошибка. Попробуйте позже.")
+        await message.answer(GENERIC_ERROR_LATER_TEXT)
@@ -1,7 +1,12 @@
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 from states import Form
+from diagnostics import traced_storage
+from replies import (
+    REMOVE_KEYBOARD, START_KEYBOARD, CREATE_PROFILE_BUTTON, WELCOME_TEXT, ASK_NAME_TEXT,
+    NAME_TOO_SHORT_TEXT, NAME_TOO_LONG_TEXT, SAVE_ERROR_RETRY_TEXT,
+    get_name_keyboard, current_name_text, name_accepted_text
+)
 import json
 import logging
 from .age_and_city import ask_age
@@ -10,6 +15,7 @@ router = Router()
 logger = logging.getLogger(__name__)
 
 # Улучшенные функции работы с профилями
+@traced_storage
 async def load_profile(user_id: int) -> dict:
     """Загрузка профиля с обработкой ошибок и логированием"""
     try:
@@ -26,6 +32,7 @@ async def load_profile(user_id: int) -> dict:
         logger.error(f"Неожиданная ошибка при загрузке профиля: {e}")
         return {}
 
+@traced_storage
 def save_profile(user_id: int, data: dict) -> bool:
     """Сохранение профиля с улучшенной обработкой ошибок"""
     try:
@@ -50,40 +57,20 @@ def save_profile(user_id: int, data: dict) -> bool:
 # Улучшенное приветствие
 @router.message(F.text == "/start")
 async def welcome_message(message: types.Message):
-    keyboard = ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="Создать анкету")],
-            [KeyboardButton(text="Моя анкета")]  # Новая кнопка для просмотра существующей анкеты
-        ],
-        resize_keyboard=True,
-        one_time_keyboard=True
-    )
-    await message.answer(
-        "Привет! Я помогу тебе создать анкету.\n"
-        "Выбери действие:",
-        reply_markup=keyboard
-    )
+    await message.answer(WELCOME_TEXT, reply_markup=START_KEYBOARD)
 
 # Старт анкеты с улучшенной логикой
-@router.message(F.text == "Создать анкету")
+@router.message(F.text == CREATE_PROFILE_BUTTON)
 async def start_profile(message: types.Message, state: FSMContext):
     user_data = await load_profile(message.from_user.id)
     
     # Формируем клавиатуру с предложением использовать сохранённое имя
     if "name" in user_data:
-        keyboard = ReplyKeyboardMarkup(
-            keyboard=[
-                [KeyboardButton(text=user_data["name"])],
-                [KeyboardButton(text="Изменить имя")]
-            ],
-            resize_keyboard=True,
-            one_time_keyboard=True
-        )
-        text = (f"Твоё текущее имя: {user_data['name']}\n"
-                "Можешь оставить его или ввести новое:")
+        keyboard = get_name_keyboard(user_data["name"])
+        text = current_name_text(user_data["name"])
     else:
-        keyboard = ReplyKeyboardRemove()
-        text = "Давай начнём с имени! Как тебя зовут?"
+        keyboard = REMOVE_KEYBOARD
+        text = ASK_NAME_TEXT
 
     await message.answer(text, reply_markup=keyboard)
     await state.set_state(Form.name)
@@ -95,21 +82,20 @@ async def process_name(message: types.Message, state: FSMContext):
     
     # Валидация имени
     if not name or len(name) < 2:
-        await message.answer("Имя должно содержать хотя бы 2 символа. Попробуй ещё раз!")
+        await message.answer(NAME_TOO_SHORT_TEXT)
         return
         
     if len(name) > 50:
-        await message.answer("Имя слишком длинное. Максимум 50 символов.")
+        await message.answer(NAME_TOO_LONG_TEXT)
         return
     
     # Сохранение с проверкой результата
     user_data = await load_profile(message.from_user.id)
     user_data["name"] = name
     if not save_profile(message.from_user.id, user_data):
-        await message.answer("Произошла ошибка при сохранении. Попробуй ещё раз.")
+        await message.answer(SAVE_ERROR_RETRY_TEXT)
         return
     
     # Переход к следующему шагу
-    await message.answer(f"Отлично, {name}! Теперь укажи свой возраст.", 
-                        reply_markup=ReplyKeyboardRemove())
+    await message.answer(name_accepted_text(name), reply_markup=REMOVE_KEYBOARD)
     await ask_age(message, state)
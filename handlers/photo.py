@@ -1,7 +1,12 @@
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
-from aiogram.types import ReplyKeyboardRemove, ReplyKeyboardMarkup, KeyboardButton
 from states import Form
+from diagnostics import traced_storage
+from replies import (
+    REMOVE_KEYBOARD, CONFIRM_KEYBOARD, EDIT_KEYBOARD, DONE_BUTTON, EDIT_PROFILE_BUTTON,
+    ASK_PHOTO_TEXT, CONFIRM_TEXT, EDIT_TEXT, PROFILE_CREATED_TEXT, PROFILE_INCOMPLETE_TEXT,
+    SAVE_ERROR_RETRY_TEXT, PHOTO_ERROR_TEXT, GENERIC_ERROR_TEXT, profile_caption
+)
 import json
 import logging
 from datetime import datetime
@@ -9,6 +14,7 @@ from datetime import datetime
 router = Router()
 logger = logging.getLogger(__name__)
 
+@traced_storage
 async def load_profile(user_id: int) -> dict:
     """Загрузка профиля с улучшенной обработкой ошибок"""
     try:
@@ -25,6 +31,7 @@ async def load_profile(user_id: int) -> dict:
         logger.error(f"Неожиданная ошибка при загрузке профиля: {e}")
         return {}
 
+@traced_storage
 async def save_full_profile(user_id: int, data: dict) -> bool:
     """Сохранение полного профиля с фото и всеми данными"""
     try:
@@ -52,9 +59,8 @@ async def save_full_profile(user_id: int, data: dict) -> bool:
 async def ask_photo(message: types.Message, state: FSMContext):
     """Запрос фотографии с инструкцией"""
     await message.answer(
-        "📸 Отправь свою фотографию для анкеты.\n"
-        "Лучше всего подойдёт чёткое фото лица.",
-        reply_markup=ReplyKeyboardRemove()
+        ASK_PHOTO_TEXT,
+        reply_markup=REMOVE_KEYBOARD
     )
     await state.set_state(Form.photo)
 
@@ -81,19 +87,7 @@ async def process_photo(message: types.Message, state: FSMContext):
         }
 
         # Форматируем текст анкеты
-        profile_text = (
-            f"👤 <b>{profile_data['name']}</b>, {profile_data['age']}, {profile_data['city']}\n"
-            f"📝 <i>{profile_data['description'] or 'Нет описания'}</i>"
-        )
-
-        # Кнопка подтверждения
-        keyboard = ReplyKeyboardMarkup(
-            keyboard=[
-                [KeyboardButton(text="✅ Готово!")],
-                [KeyboardButton(text="🔄 Изменить анкету")]
-            ],
-            resize_keyboard=True
-        )
+        profile_text = profile_caption(profile_data)
 
         # Отправляем фото с анкетой
         await message.answer_photo(
@@ -104,8 +98,8 @@ async def process_photo(message: types.Message, state: FSMContext):
         
         # Сообщение с кнопками
         await message.answer(
-            "Вот так будет выглядеть твоя анкета. Всё правильно?",
-            reply_markup=keyboard
+            CONFIRM_TEXT,
+            reply_markup=CONFIRM_KEYBOARD
         )
 
         # Сохраняем данные в состоянии для возможного редактирования
@@ -113,9 +107,9 @@ async def process_photo(message: types.Message, state: FSMContext):
         
     except Exception as e:
         logger.error(f"Ошибка обработки фото: {e}")
-        await message.answer("Произошла ошибка при обработке фото. Попробуй ещё раз.")
+        await message.answer(PHOTO_ERROR_TEXT)
 
-@router.message(F.text == "✅ Готово!")
+@router.message(F.text == DONE_BUTTON)
 async def finish_profile(message: types.Message, state: FSMContext):
     """Финальное сохранение анкеты"""
     try:
@@ -123,19 +117,19 @@ async def finish_profile(message: types.Message, state: FSMContext):
         
         # Проверяем, что есть все необходимые данные
         if not all(key in data for key in ['name', 'age', 'city', 'photo']):
-            await message.answer("Кажется, в анкете не хватает данных. Давай попробуем ещё раз!")
+            await message.answer(PROFILE_INCOMPLETE_TEXT)
             return
 
         # Сохраняем профиль
         if await save_full_profile(message.from_user.id, data):
             await message.answer(
-                "🎉 Анкета успешно создана!",
-                reply_markup=ReplyKeyboardRemove()
+                PROFILE_CREATED_TEXT,
+                reply_markup=REMOVE_KEYBOARD
             )
         else:
             await message.answer(
-                "Произошла ошибка при сохранении. Попробуй ещё раз.",
-                reply_markup=ReplyKeyboardRemove()
+                SAVE_ERROR_RETRY_TEXT,
+                reply_markup=REMOVE_KEYBOARD
             )
         
         # Очищаем состояние
@@ -143,21 +137,12 @@ async def finish_profile(message: types.Message, state: FSMContext):
         
     except Exception as e:
         logger.error(f"Ошибка завершения анкеты: {e}")
-        await message.answer("Произошла ошибка. Попробуй ещё раз.")
+        await message.answer(GENERIC_ERROR_TEXT)
 
-@router.message(F.text == "🔄 Изменить анкету")
+@router.message(F.text == EDIT_PROFILE_BUTTON)
 async def edit_profile(message: types.Message, state: FSMContext):
     """Редактирование анкеты"""
     await message.answer(
-        "Давай исправим анкету. С чего начнём?",
-        reply_markup=ReplyKeyboardMarkup(
-            keyboard=[
-                [KeyboardButton(text="Изменить имя")],
-                [KeyboardButton(text="Изменить возраст")],
-                [KeyboardButton(text="Изменить город")],
-                [KeyboardButton(text="Изменить описание")],
-                [KeyboardButton(text="Изменить фото")]
-            ],
-            resize_keyboard=True
-        )
+        EDIT_TEXT,
+        reply_markup=EDIT_KEYBOARD
     )
@@ -3,14 +3,16 @@ import logging
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 import os
 
+# Загрузка переменных из .env (до импорта модулей, читающих окружение)
+load_dotenv()
+
 from handlers import age_and_city, name, description, photo
+from diagnostics import diagnostics, router as diagnostics_router
+from fsm_storage import ExpiringMemoryStorage, env_float
 
-# Загрузка переменных из .env
-load_dotenv()
 TOKEN = os.getenv("BOT_TOKEN")
 
 if not TOKEN:
@@ -25,10 +27,18 @@ bot = Bot(
     token=TOKEN,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
-dp = Dispatcher(storage=MemoryStorage())
+# Хранилище FSM с истечением брошенных анкет (FSM_NUDGE_BEFORE=0 отключает напоминание)
+storage = ExpiringMemoryStorage(
+    default_ttl=env_float("FSM_DEFAULT_TTL", 60 * 60),
+    nudge_before=env_float("FSM_NUDGE_BEFORE", 10 * 60) or None
+)
+dp = Dispatcher(storage=storage)
+dp.startup.register(storage.start)
+dp.shutdown.register(storage.close)
 
 # Подключение роутеров
 routers = [
+    diagnostics_router,
     name.router,
     age_and_city.router,
     description.router,
@@ -38,13 +48,19 @@ routers = [
 for router in routers:
     dp.include_router(router)
 
+# Диагностика: сторож event loop и трассировка медленных апдейтов
+diagnostics.setup(dp, bot)
+
 async def main():
     try:
+        if os.getenv("DIAGNOSTICS_ENABLED", "").lower() in ("1", "true", "yes"):
+            diagnostics.enable()
         logger.info("Бот запущен...")
         await dp.start_polling(bot)
     except Exception as e:
         logger.exception(f"Произошла ошибка: {e}")
     finally:
+        diagnostics.disable()
         await bot.session.close()
         logger.info("Бот остановлен.")
 
@@ -0,0 +1,132 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union
+
+from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+
+# Реестр клавиатур и шаблонов ответов.
+# Статические клавиатуры собираются один раз при импорте, персональные (город, возраст, имя)
+# кешируются по аргументу в LRU. Объекты клавиатур общие для всех ответов — не изменяйте их.
+
+PER_USER_CACHE_SIZE = 1024
+
+SKIP_TEXT = "Пропустить"
+# Сравнение с вводом пользователя без учёта регистра
+SKIP_TEXT_LOWER = SKIP_TEXT.lower()
+
+# Подписи кнопок, на которые реагируют обработчики
+CREATE_PROFILE_BUTTON = "Создать анкету"
+DONE_BUTTON = "✅ Готово!"
+EDIT_PROFILE_BUTTON = "🔄 Изменить анкету"
+
+
+def _build_keyboard(*rows: str, one_time: bool = True) -> ReplyKeyboardMarkup:
+    """Собирает клавиатуру: одна кнопка в строке"""
+    return ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=text)] for text in rows],
+        resize_keyboard=True,
+        one_time_keyboard=one_time or None
+    )
+
+
+# Статические клавиатуры
+REMOVE_KEYBOARD = ReplyKeyboardRemove()
+SKIP_KEYBOARD = _build_keyboard(SKIP_TEXT)
+START_KEYBOARD = _build_keyboard(CREATE_PROFILE_BUTTON, "Моя анкета")
+CONFIRM_KEYBOARD = _build_keyboard(DONE_BUTTON, EDIT_PROFILE_BUTTON, one_time=False)
+EDIT_KEYBOARD = _build_keyboard(
+    "Изменить имя",
+    "Изменить возраст",
+    "Изменить город",
+    "Изменить описание",
+    "Изменить фото",
+    one_time=False
+)
+
+
+def get_skip_keyboard() -> ReplyKeyboardMarkup:
+    return SKIP_KEYBOARD
+
+
+@lru_cache(maxsize=PER_USER_CACHE_SIZE)
+def _city_keyboard(city: str) -> ReplyKeyboardMarkup:
+    return _build_keyboard(city, SKIP_TEXT)
+
+
+def get_city_keyboard(city: Optional[str] = None) -> ReplyKeyboardMarkup:
+    """Возвращает клавиатуру для выбора города"""
+    if city:
+        return _city_keyboard(city)
+    return SKIP_KEYBOARD
+
+
+@lru_cache(maxsize=PER_USER_CACHE_SIZE)
+def _age_keyboard(age: int) -> ReplyKeyboardMarkup:
+    return _build_keyboard(str(age))
+
+
+def get_age_keyboard(age: Optional[int] = None) -> Union[ReplyKeyboardMarkup, ReplyKeyboardRemove]:
+    """Возвращает клавиатуру для выбора возраста"""
+    if age is not None:
+        return _age_keyboard(age)
+    return REMOVE_KEYBOARD
+
+
+@lru_cache(maxsize=PER_USER_CACHE_SIZE)
+def get_name_keyboard(name: str) -> ReplyKeyboardMarkup:
+    """Клавиатура с сохранённым именем"""
+    return _build_keyboard(name, "Изменить имя")
+
+
+# Шаблоны сообщений
+WELCOME_TEXT = (
+    "Привет! Я помогу тебе создать анкету.\n"
+    "Выбери действие:"
+)
+ASK_NAME_TEXT = "Давай начнём с имени! Как тебя зовут?"
+ASK_AGE_TEXT = "📅 Введите ваш возраст (от 12 до 99 лет):"
+ASK_CITY_TEXT = "🏙 В каком городе вы живете?"
+ASK_DESCRIPTION_TEXT = "✏️ Теперь расскажите немного о себе (минимум 10 символов):"
+ASK_PHOTO_TEXT = (
+    "📸 Отправь свою фотографию для анкеты.\n"
+    "Лучше всего подойдёт чёткое фото лица."
+)
+CONFIRM_TEXT = "Вот так будет выглядеть твоя анкета. Всё правильно?"
+EDIT_TEXT = "Давай исправим анкету. С чего начнём?"
+PROFILE_CREATED_TEXT = "🎉 Анкета успешно создана!"
+DESCRIPTION_SKIPPED_TEXT = "✅ Описание пропущено."
+DESCRIPTION_SAVED_TEXT = "✅ Описание сохранено!"
+
+# Ошибки валидации и сохранения
+NAME_TOO_SHORT_TEXT = "Имя должно содержать хотя бы 2 символа. Попробуй ещё раз!"
+NAME_TOO_LONG_TEXT = "Имя слишком длинное. Максимум 50 символов."
+AGE_NOT_NUMBER_TEXT = "❌ Возраст должен быть числом. Попробуйте еще раз!"
+AGE_TOO_LOW_TEXT = "❌ Минимальный возраст - 12 лет."
+AGE_TOO_HIGH_TEXT = "❌ Максимальный возраст - 99 лет."
+CITY_TOO_SHORT_TEXT = "❌ Название города слишком короткое."
+CITY_TOO_LONG_TEXT = "❌ Название города слишком длинное."
+DESCRIPTION_INVALID_TEXT = "❌ Описание должно быть не короче 10 символов и 2 слов."
+DESCRIPTION_FORBIDDEN_TEXT = "❌ Обнаружены запрещённые слова."
+PROFILE_INCOMPLETE_TEXT = "Кажется, в анкете не хватает данных. Давай попробуем ещё раз!"
+SAVE_ERROR_TEXT = "⚠️ Произошла ошибка при сохранении."
+SAVE_ERROR_RETRY_LATER_TEXT = "⚠️ Произошла ошибка при сохранении. Попробуйте позже."
+SAVE_ERROR_RETRY_TEXT = "Произошла ошибка при сохранении. Попробуй ещё раз."
+PHOTO_ERROR_TEXT = "Произошла ошибка при обработке фото. Попробуй ещё раз."
+GENERIC_ERROR_TEXT = "Произошла ошибка. Попробуй ещё раз."
+GENERIC_ERROR_LATER_TEXT = "❌ Ошибка. Попробуйте позже."
+
+# Шаблоны с подстановкой
+def current_name_text(name: str) -> str:
+    return (f"Твоё текущее имя: {name}\n"
+            "Можешь оставить его или ввести новое:")
+
+
+def name_accepted_text(name: str) -> str:
+    return f"Отлично, {name}! Теперь укажи свой возраст."
+
+
+def profile_caption(profile: Dict[str, Any]) -> str:
+    """Подпись к фото анкеты"""
+    return (
+        f"👤 <b>{profile['name']}</b>, {profile['age']}, {profile['city']}\n"
+        f"📝 <i>{profile['description'] or 'Нет описания'}</i>"
+    )
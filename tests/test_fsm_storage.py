@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+
+from fsm_storage import ExpiringMemoryStorage, HEAP_COMPACT_SLACK
+
+STATE = "Form:age"
+
+
+class FakeBot:
+    """Бот, который только запоминает отправленные напоминания"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append(chat_id)
+
+
+def make_key(user_id: int = 1) -> StorageKey:
+    return StorageKey(bot_id=42, chat_id=user_id, user_id=user_id)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_reads_do_not_create_records():
+    async def scenario():
+        storage = ExpiringMemoryStorage(step_ttl={}, default_ttl=60)
+        key = make_key()
+        assert await storage.get_state(key) is None
+        assert await storage.get_data(key) == {}
+        assert await storage.get_value(key, "name", "default") == "default"
+        assert storage.active_sessions == 0
+        assert not storage._tokens
+
+    run(scenario())
+
+
+def test_nudge_is_sent_before_expiry_and_expiry_drops_session():
+    async def scenario():
+        storage = ExpiringMemoryStorage(step_ttl={STATE: 0.2}, nudge_before=0.1)
+        bot = FakeBot()
+        await storage.start(bot)
+        key = make_key()
+        await storage.set_state(key, STATE)
+
+        await asyncio.sleep(0.15)
+        assert bot.sent == [key.chat_id]
+        assert storage.active_sessions == 1
+
+        await asyncio.sleep(0.1)
+        assert storage.active_sessions == 0
+        assert key not in storage._tokens
+        assert not storage._heap
+        await storage.close()
+
+    run(scenario())
+
+
+def test_activity_without_writes_keeps_session_alive():
+    async def scenario():
+        storage = ExpiringMemoryStorage(step_ttl={STATE: 0.2}, nudge_before=0.1)
+        bot = FakeBot()
+        await storage.start(bot)
+        key = make_key()
+        await storage.set_state(key, STATE)
+
+        # Обработчик отклоняет ввод и ничего не пишет, но апдейты приходят
+        for _ in range(6):
+            await asyncio.sleep(0.05)
+            assert await storage.get_state(key) == STATE
+
+        assert bot.sent == []
+        assert storage.active_sessions == 1
+        await storage.close()
+
+    run(scenario())
+
+
+def test_clear_drops_key():
+    async def scenario():
+        storage = ExpiringMemoryStorage(step_ttl={STATE: 60})
+        key = make_key()
+        context = FSMContext(storage=storage, key=key)
+        await context.set_state(STATE)
+        await context.update_data(name="Аня")
+        assert storage.active_sessions == 1
+
+        await context.clear()
+        assert storage.active_sessions == 0
+        assert key not in storage._tokens
+
+    run(scenario())
+
+
+def test_heap_is_compacted_on_repeated_touches():
+    async def scenario():
+        storage = ExpiringMemoryStorage(step_ttl={STATE: 60}, nudge_before=10)
+        key = make_key()
+        await storage.set_state(key, STATE)
+
+        for _ in range(10_000):
+            await storage.get_state(key)
+
+        assert len(storage._heap) <= 4 * len(storage._tokens) + HEAP_COMPACT_SLACK
+
+    run(scenario())
+
+
+def test_slow_nudge_does_not_delay_other_expiries():
+    class SlowBot(FakeBot):
+        async def send_message(self, chat_id, text):
+            await asyncio.sleep(10)
+
+    async def scenario():
+        storage = ExpiringMemoryStorage(step_ttl={STATE: 0.2, "Form:name": 0.1}, nudge_before=0.15)
+        await storage.start(SlowBot())
+        slow, other = make_key(1), make_key(2)
+        await storage.set_state(slow, STATE)
+        await storage.set_state(other, "Form:name")
+
+        await asyncio.sleep(0.15)
+        assert other not in storage._tokens
+        await storage.close()
+        assert not storage._nudges
+
+    run(scenario())